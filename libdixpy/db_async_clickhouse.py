@@ -8,19 +8,32 @@ from libdixpy import async_clickhouse
 или
 import libdixpy
 connector = libdixpy.async_clickhouse(config)
+
+Для частых небольших запросов без pandas:
+result, rows = await connector.execute_query_tuples("SELECT id, name FROM db.table WHERE id = 1")
+result, value = await connector.execute_query_scalar("SELECT count() FROM db.table")
+result, columns = await connector.execute_query_columns("SELECT id, price FROM db.table LIMIT 10")
 """
 #
-dv_file_version = '250904.01'
+dv_file_version = '261019.02'
 #
 import aiohttp
 import numpy as np
 import pandas as pd
 from io import StringIO
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import json
 import csv
 import chardet  # для автоопределения кодировки
 
+# Соответствие типов ClickHouse и NumPy для execute_query_columns
+_NUMPY_DTYPES = {
+    'Int8': np.int8, 'Int16': np.int16, 'Int32': np.int32, 'Int64': np.int64,
+    'UInt8': np.uint8, 'UInt16': np.uint16, 'UInt32': np.uint32, 'UInt64': np.uint64,
+    'Float32': np.float32, 'Float64': np.float64,
+    'Bool': np.bool_,
+}
+
 
 class async_clickhouse:
     def __init__(self, config: Dict[str, str]):
@@ -87,6 +100,9 @@ class async_clickhouse:
                     params['query'] = f"{sql} FORMAT {format}"
                     headers['Accept'] = 'application/json; charset=utf-8'
                     headers['Accept-Charset'] = 'utf-8'
+                    if format == 'JSONCompact':
+                        # 64-битные числа отдаем числами, а не строками (для tuples/scalar/columns)
+                        params['output_format_json_quote_64bit_integers'] = 0
                 else:
                     params['query'] = sql
             async with method(
@@ -116,7 +132,7 @@ class async_clickhouse:
                 result['status'] = 'SUCCESS'
                 #
                 # Обработка успешного ответа
-                if format == 'JSON' and response_bytes and not data and sql.strip().upper().startswith('SELECT'):
+                if format in ('JSON', 'JSONCompact') and response_bytes and not data and sql.strip().upper().startswith('SELECT'):
                     # Пытаемся декодировать JSON-ответ
                     try:
                         # Предполагаем UTF-8
@@ -133,7 +149,11 @@ class async_clickhouse:
                             return result
                     #
                     try:
-                        result['data'] = json.loads(response_text).get('data', [])
+                        response_json = json.loads(response_text)
+                        result['data'] = response_json.get('data', [])
+                        if format == 'JSONCompact':
+                            # В JSONCompact строки - это списки значений, имена и типы колонок лежат в meta
+                            result['meta'] = response_json.get('meta', [])
                     except json.JSONDecodeError as e:
                         result['status'] = 'ERROR'
                         result['message'] = f"_make_request - Ошибка JSON: {str(e)}, response_text[:200]: {response_text[:200]}"
@@ -272,6 +292,62 @@ class async_clickhouse:
         df = pd.DataFrame(result['data']) if result.get('data') else None
         return result, df
 
+    async def execute_query_tuples(self, sql: str) -> Tuple[Dict, Optional[List[tuple]]]:
+        """
+        Выполнение SELECT запроса без pandas (для частых небольших запросов)
+
+        :param sql: SQL запрос
+        :return: (результат, список строк-кортежей), имена колонок в result['columns']
+        """
+        result = await self._make_request(sql, format='JSONCompact')
+        result['columns'] = [column['name'] for column in result.get('meta', [])]
+        rows = [tuple(row) for row in result['data']] if result.get('data') else None
+        return result, rows
+
+    async def execute_query_scalar(self, sql: str) -> Tuple[Dict, Any]:
+        """
+        Выполнение SELECT запроса, возвращающего одно значение (первая колонка первой строки)
+
+        :param sql: SQL запрос
+        :return: (результат, значение или None)
+        """
+        result = await self._make_request(sql, format='JSONCompact')
+        value = result['data'][0][0] if result.get('data') and result['data'][0] else None
+        return result, value
+
+    async def execute_query_columns(self, sql: str) -> Tuple[Dict, Optional[Dict[str, np.ndarray]]]:
+        """
+        Выполнение SELECT запроса с результатом по колонкам в NumPy-массивах (без pandas)
+
+        :param sql: SQL запрос
+        :return: (результат, {имя колонки: np.ndarray})
+        """
+        result = await self._make_request(sql, format='JSONCompact')
+        if not result.get('data'):
+            return result, None
+        meta = result.get('meta', [])
+        columns = {}
+        for column, values in zip(meta, zip(*result['data'])):
+            dtype = self._numpy_dtype(column['type'])
+            if dtype is object:
+                # Поэлементно, иначе Array(...)/Tuple(...) одинаковой длины NumPy превратит в 2-D массив
+                array = np.empty(len(values), dtype=object)
+                for i, value in enumerate(values):
+                    array[i] = value
+            else:
+                array = np.array(values, dtype=dtype)
+            columns[column['name']] = array
+        return result, columns
+
+    @staticmethod
+    def _numpy_dtype(ch_type: str):
+        """Тип NumPy для типа колонки ClickHouse (Nullable, строки, даты и прочее - object)"""
+        if ch_type.startswith('LowCardinality('):
+            ch_type = ch_type[len('LowCardinality('):-1]
+        if ch_type in _NUMPY_DTYPES:
+            return _NUMPY_DTYPES[ch_type]
+        return object
+
     async def execute_command(self, sql: str) -> Dict:
         """
         Выполнение DDL команды
@@ -21,13 +21,33 @@ setup_logging(
 logger.info("Запуск приложения")
 logger.debug("Отладочная информация")
 logger.error("Ошибка в приложении")
+
+# Создаст файл my_application.jsonl (одна строка JSON на сообщение, запись через большой буфер)
+setup_logging(
+    log_level='INFO',
+    path_to_log='/var/log/myapp',
+    app_name='my_application',
+    log_file_format='json'
+)
+
+# Не более 5 сообщений ERROR в секунду с одного места вызова, остальные подавляются
+setup_logging(log_level='INFO', app_name='my_application', rate_limit={'ERROR': 5})
 """
 #
-dv_file_version = '250904.02'
+dv_file_version = '261019.06'
 #
+import os
 import re
+import atexit
 import sys
+import glob
+import gzip
+import json
+import shutil
+import time
 import datetime
+import threading
+import traceback
 from loguru import logger
 
 # Предкомпилируем регулярное выражение для максимальной производительности
@@ -41,28 +61,211 @@ _SECRET_PATTERN = re.compile(
 class LogRotator:
     """
     Ротация лог-файла в зависимости от двух параметров: от размера и от времени.
+
+    loguru вызывает should_rotate на каждое сообщение, поэтому размер файла отслеживается
+    инкрементально в байтах (seek/tell выполняется только один раз для каждого нового файла),
+    а время сравнивается с закэшированной меткой следующей ротации.
     """
 
-    def __init__(self, *, size, at):
+    def __init__(self, *, size, at, encoding='utf-8'):
         now = datetime.datetime.now()
         self._size_limit = size
         self._time_limit = now.replace(hour=at.hour, minute=at.minute, second=at.second)
 
         if now >= self._time_limit:
             self._time_limit += datetime.timedelta(days=1)
+        self._time_limit_ts = self._time_limit.timestamp()
+
+        self._encoding = encoding
+        self._file = None
+        self._file_size = 0
 
     def should_rotate(self, message, file):
-        file.seek(0, 2)
-        if file.tell() + len(message) > self._size_limit:
+        if file is not self._file:
+            # Новый файл (первый вызов или после ротации) - узнаем его реальный размер один раз
+            self._file = file
+            file.seek(0, 2)
+            self._file_size = file.tell()
+        # Лимит задан в байтах: для не-ASCII (кириллица) символ занимает больше одного байта
+        message_size = len(message) if message.isascii() else len(message.encode(self._encoding))
+        if self._file_size + message_size > self._size_limit:
             return True
-        excess = message.record["time"].timestamp() - self._time_limit.timestamp()
+        timestamp = message.record["time"].timestamp()
+        excess = timestamp - self._time_limit_ts
         if excess >= 0:
             elapsed_days = datetime.timedelta(seconds=excess).days
             self._time_limit += datetime.timedelta(days=elapsed_days + 1)
+            self._time_limit_ts = self._time_limit.timestamp()
             return True
+        self._file_size += message_size
         return False
 
 
+class JsonFileSink:
+    """
+    Файловый sink для loguru с большим буфером записи и сбросом буфера на диск по таймеру.
+
+    Запись идет через буфер размером buffer_size, отдельный поток раз в flush_interval секунд
+    сбрасывает его на диск (в том числе когда приложение простаивает).
+    Ротация выполняется по rotator.should_rotate, старый файл сжимается в .gz,
+    архивы старше retention_days дней удаляются.
+    """
+
+    def __init__(self, path, *, rotator, buffer_size=1024 * 1024, flush_interval=1.0, retention_days=30, encoding='utf-8'):
+        self._path = path
+        self._rotator = rotator
+        self._buffer_size = buffer_size
+        self._retention_days = retention_days
+        self._encoding = encoding
+        self._lock = threading.Lock()
+        self._file = self._open()
+        self._stop_event = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, args=(flush_interval,), name='libdixpy-log-flush', daemon=True)
+        self._flusher.start()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+        return open(self._path, 'a', buffering=self._buffer_size, encoding=self._encoding)
+
+    def _flush_loop(self, flush_interval):
+        while not self._stop_event.wait(flush_interval):
+            with self._lock:
+                if self._file is not None and not self._file.closed:
+                    self._file.flush()
+
+    def _rotate(self):
+        self._file.close()
+        root, ext = os.path.splitext(self._path)
+        rotated = f"{root}.{datetime.datetime.now():%Y-%m-%d_%H-%M-%S_%f}{ext}"
+        try:
+            os.rename(self._path, rotated)
+        finally:
+            # Новый файл открываем сразу, чтобы ошибка сжатия или очистки не остановила запись лога
+            self._file = self._open()
+        with open(rotated, 'rb') as src, gzip.open(f"{rotated}.gz", 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(rotated)
+        expired = time.time() - self._retention_days * 86400
+        for archive in glob.glob(f"{glob.escape(root)}.*{ext}.gz"):
+            try:
+                if os.path.getmtime(archive) < expired:
+                    os.remove(archive)
+            except OSError:
+                # Архив мог удалить другой процесс с тем же app_name
+                pass
+
+    def write(self, message):
+        with self._lock:
+            if self._file is None or self._file.closed:
+                self._file = self._open()
+            if self._rotator.should_rotate(message, self._file):
+                try:
+                    self._rotate()
+                finally:
+                    # Сообщение пишем и при ошибке сжатия/очистки, если новый файл уже открыт
+                    if not self._file.closed:
+                        self._file.write(message)
+            else:
+                self._file.write(message)
+
+    def stop(self):
+        # loguru вызывает stop при logger.remove() и при завершении программы
+        self._stop_event.set()
+        self._flusher.join()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class LogRateLimiter:
+    """
+    Ограничение частоты одинаковых сообщений (token bucket) для каждого места вызова (name:function:line) и уровня.
+
+    Каждому месту вызова выдается burst токенов, которые пополняются со скоростью rate в секунду.
+    Сообщения сверх лимита отбрасываются. Раз в summary_interval секунд (и при остановке) для каждого места вызова,
+    где были отброшенные сообщения, пишется отдельная строка "N similar messages suppressed".
+    rate - число (одинаковый лимит для всех уровней) или словарь {'ERROR': 5, ...} (уровни не из словаря не ограничиваются).
+    Один экземпляр используется как filter для всех обработчиков: решение по записи принимается один раз
+    и переиспользуется остальными обработчиками.
+    """
+
+    def __init__(self, *, rate, burst=None, summary_interval=1.0, clock=time.monotonic):
+        self._rate = rate
+        self._burst = burst
+        self._clock = clock
+        # ключ -> [токены, время последнего пополнения, число подавленных сообщений, rate, burst]
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._last = threading.local()
+        self._stop_event = threading.Event()
+        self._summary_thread = threading.Thread(target=self._summary_loop, args=(summary_interval,),
+                                                name='libdixpy-log-rate-limit', daemon=True)
+        self._summary_thread.start()
+
+    def filter(self, record):
+        if record["extra"].get('rate_limit_summary'):
+            # Итоговая строка самого ограничителя не ограничивается и не тратит токены
+            return True
+        last = self._last
+        if getattr(last, 'record', None) is record:
+            return last.allowed
+        level_name = record["level"].name
+        rate = self._rate.get(level_name) if isinstance(self._rate, dict) else self._rate
+        if rate is None:
+            # Уровень не ограничивается - без блокировки
+            return True
+        key = (record["name"], record["function"], record["line"], level_name)
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                burst = self._burst if self._burst is not None else max(rate, 1)
+                self._buckets[key] = [burst - 1, now, 0, rate, burst]
+                allowed = True
+            else:
+                tokens = min(bucket[4], bucket[0] + (now - bucket[1]) * bucket[3])
+                bucket[1] = now
+                if tokens >= 1:
+                    bucket[0] = tokens - 1
+                    allowed = True
+                else:
+                    bucket[0] = tokens
+                    bucket[2] += 1
+                    allowed = False
+        last.record = record
+        last.allowed = allowed
+        return allowed
+
+    def pop_suppressed(self):
+        """
+        Возвращает [(name, function, line, level, N), ...] для мест вызова с отброшенными сообщениями и обнуляет счетчики.
+        """
+        suppressed = []
+        with self._lock:
+            for key, bucket in self._buckets.items():
+                if bucket[2]:
+                    suppressed.append((*key, bucket[2]))
+                    bucket[2] = 0
+        return suppressed
+
+    def log_summaries(self):
+        for name, function, line, level, count in self.pop_suppressed():
+            logger.bind(rate_limit_summary=True).patch(
+                lambda record, name=name, function=function, line=line: record.update(name=name, function=function, line=line)
+            ).log(level, f"{count} similar messages suppressed")
+
+    def _summary_loop(self, summary_interval):
+        while not self._stop_event.wait(summary_interval):
+            self.log_summaries()
+
+    def stop(self):
+        """Останавливает поток итоговых строк и пишет оставшиеся итоги."""
+        self._stop_event.set()
+        self._summary_thread.join()
+        self.log_summaries()
+
+
 def log_message_secret(message: str):
     """
     Функция скрывает конфиденциальную информацию в строке, например такую конструкцию {'my_token': '1111111'} на такую {'my_token': 'secret'}
@@ -78,7 +281,44 @@ def log_format_secret(record):
     return "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>#<cyan>{line}</cyan> | <level>{extra[message_secret]}</level>\n{exception}"
 
 
-def setup_logging(log_level='ERROR', path_to_log='.', app_name='app', script_name=None):
+def log_format_json(record):
+    """
+    Задаем формат лога в виде одной строки JSON (newline-delimited JSON) с заменой секретных данных.
+    """
+    data = {
+        'time': record["time"].isoformat(),
+        'level': record["level"].name,
+        'name': record["name"],
+        'function': record["function"],
+        'line': record["line"],
+        'message': log_message_secret(record["message"]),
+    }
+    extra = {key: value for key, value in record["extra"].items() if key not in ('message_secret', 'json', 'rate_limit_summary')}
+    if extra:
+        data['extra'] = extra
+    if record["exception"] is not None:
+        exc_type, exc_value, exc_traceback = record["exception"]
+        data['exception'] = log_message_secret(''.join(traceback.format_exception(exc_type, exc_value, exc_traceback)))
+    record["extra"]["json"] = json.dumps(data, ensure_ascii=False, default=str, separators=(',', ':'))
+    return "{extra[json]}\n"
+
+
+# Текущий ограничитель частоты из setup_logging (нужен, чтобы остановить его и записать итоги)
+_log_rate_limiter = None
+
+
+def _stop_log_rate_limiter():
+    if _log_rate_limiter is not None:
+        _log_rate_limiter.stop()
+
+
+# Регистрируется после atexit loguru, поэтому выполняется раньше удаления обработчиков
+atexit.register(_stop_log_rate_limiter)
+
+
+def setup_logging(log_level='ERROR', path_to_log='.', app_name='app', script_name=None,
+                  log_file_format='text', json_buffer_size=1024 * 1024, json_flush_interval=1.0,
+                  rate_limit=None, rate_limit_burst=None):
     """
     Настройка логирования.
 
@@ -87,36 +327,70 @@ def setup_logging(log_level='ERROR', path_to_log='.', app_name='app', script_nam
         path_to_log (str): Путь для сохранения лог-файлов
         app_name (str): Имя приложения для именования лог-файла
         script_name (str, optional): Имя скрипта для лог-файла. Если не указано, используется app_name
+        log_file_format (str): Формат лог-файла: 'text' (по умолчанию) или 'json' (одна строка JSON на сообщение, файл .jsonl)
+        json_buffer_size (int): Размер буфера записи в байтах для формата 'json'
+        json_flush_interval (float): Как часто (в секундах) сбрасывать буфер на диск для формата 'json'
+        rate_limit (float | dict, optional): Сколько сообщений в секунду пропускать с одного места вызова (name:function:line)
+            для каждого уровня. Можно задать словарем по уровням: {'ERROR': 5}. Если не указано, ограничения нет
+        rate_limit_burst (int, optional): Сколько сообщений подряд можно пропустить до начала ограничения. По умолчанию max(rate_limit, 1)
     """
+    global _log_rate_limiter
+
+    # Итоги предыдущего ограничителя частоты пишем до удаления обработчиков
+    if _log_rate_limiter is not None:
+        _log_rate_limiter.stop()
+        _log_rate_limiter = None
+
     # отключаем стандартное логирование в консоль
     logger.remove()
 
+    if log_file_format not in ['text', 'json']:
+        log_file_format = 'text'
+
     # Включаем ротацию, если файл превышает 10 МБ или в полночь каждый день
-    log_rotator = LogRotator(size=1e+7, at=datetime.time(0, 0, 0))
+    log_rotator = LogRotator(size=1e+7, at=datetime.time(0, 0, 0), encoding='utf-8')
 
     # Устанавливаем уровень логирования
     if log_level not in ['DEBUG', 'INFO', 'WARNING', 'ERROR']:
         log_level = 'ERROR'
 
+    # Ограничение частоты одинаковых сообщений (один экземпляр на все обработчики)
+    log_filter = None
+    if rate_limit:
+        _log_rate_limiter = LogRateLimiter(rate=rate_limit, burst=rate_limit_burst)
+        log_filter = _log_rate_limiter.filter
+
     # Логирование в консоль
-    logger.add(sys.stderr, level=log_level, format=log_format_secret, colorize=True, enqueue=True)
+    logger.add(sys.stderr, level=log_level, format=log_format_secret, filter=log_filter, colorize=True, enqueue=True)
 
     # Формируем имя лог-файла
+    log_file_ext = 'jsonl' if log_file_format == 'json' else 'log'
     if script_name:
         # Если указано script_name, используем формат: app_name_script_name.log
-        log_file = f"{path_to_log}/{app_name}_{script_name}.log"
+        log_file = f"{path_to_log}/{app_name}_{script_name}.{log_file_ext}"
     else:
         # Если script_name не указано, оставляем формат: app_name.log
-        log_file = f"{path_to_log}/{app_name}.log"
+        log_file = f"{path_to_log}/{app_name}.{log_file_ext}"
 
     # Логирование в файл:
     # Параметр enqueue=True заставляет loguru использовать внутреннюю очередь и отдельный поток для записи, что практически устраняет блокировку event loop.
-    logger.add(
-        log_file, level=log_level, format=log_format_secret,
-        rotation=log_rotator.should_rotate, retention='30 days',
-        compression="gz", encoding="utf-8", enqueue=True,
-        backtrace=True, diagnose=True, catch=True
-    )
+    if log_file_format == 'json':
+        # Большой буфер записи вместо построчного, сброс на диск раз в json_flush_interval секунд
+        json_sink = JsonFileSink(
+            log_file, rotator=log_rotator, buffer_size=json_buffer_size,
+            flush_interval=json_flush_interval, retention_days=30, encoding="utf-8"
+        )
+        logger.add(
+            json_sink, level=log_level, format=log_format_json, filter=log_filter,
+            enqueue=True, catch=True
+        )
+    else:
+        logger.add(
+            log_file, level=log_level, format=log_format_secret, filter=log_filter,
+            rotation=log_rotator.should_rotate, retention='30 days',
+            compression="gz", encoding="utf-8", enqueue=True,
+            backtrace=True, diagnose=True, catch=True
+        )
 
     return logger
 
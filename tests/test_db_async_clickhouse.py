@@ -0,0 +1,77 @@
+import asyncio
+import numpy as np
+from libdixpy import async_clickhouse
+
+
+def make_connector(rows, meta):
+    connector = async_clickhouse({'url': 'http://localhost:8123'})
+
+    async def fake_make_request(sql, data=None, format=None):
+        assert format == 'JSONCompact'
+        return {'status': 'SUCCESS', 'message': '', 'data': rows, 'meta': meta}
+
+    connector._make_request = fake_make_request
+    return connector
+
+
+META = [
+    {'name': 'id', 'type': 'UInt64'},
+    {'name': 'price', 'type': 'Float64'},
+    {'name': 'tags', 'type': 'Array(UInt8)'},
+    {'name': 'name', 'type': 'LowCardinality(String)'},
+]
+DATA = [
+    [1, 10.5, [1, 2], 'a'],
+    [2, 20.0, [3, 4], 'b'],
+]
+
+
+def test_numpy_dtype():
+    assert async_clickhouse._numpy_dtype('Int32') is np.int32
+    assert async_clickhouse._numpy_dtype('LowCardinality(UInt16)') is np.uint16
+    assert async_clickhouse._numpy_dtype('Nullable(Int64)') is object
+    assert async_clickhouse._numpy_dtype('LowCardinality(Nullable(String))') is object
+    assert async_clickhouse._numpy_dtype('Array(UInt8)') is object
+
+
+def test_execute_query_columns():
+    connector = make_connector(DATA, META)
+    result, columns = asyncio.run(connector.execute_query_columns('SELECT 1'))
+    assert result['status'] == 'SUCCESS'
+    assert list(columns) == ['id', 'price', 'tags', 'name']
+    assert columns['id'].dtype == np.uint64 and columns['id'].tolist() == [1, 2]
+    assert columns['price'].dtype == np.float64
+    # Array одинаковой длины остается одномерной колонкой из списков
+    assert columns['tags'].dtype == object and columns['tags'].shape == (2,)
+    assert columns['tags'][1] == [3, 4]
+    assert columns['name'].tolist() == ['a', 'b']
+
+
+def test_execute_query_columns_empty_arrays():
+    connector = make_connector([[[]], [[]], [[]]], [{'name': 'tags', 'type': 'Array(UInt8)'}])
+    result, columns = asyncio.run(connector.execute_query_columns('SELECT 1'))
+    assert columns['tags'].shape == (3,)
+
+
+def test_execute_query_tuples():
+    connector = make_connector(DATA, META)
+    result, rows = asyncio.run(connector.execute_query_tuples('SELECT 1'))
+    assert result['columns'] == ['id', 'price', 'tags', 'name']
+    assert rows == [(1, 10.5, [1, 2], 'a'), (2, 20.0, [3, 4], 'b')]
+
+
+def test_empty_result():
+    connector = make_connector([], META)
+    result, value = asyncio.run(connector.execute_query_scalar('SELECT 1'))
+    assert value is None
+    result, rows = asyncio.run(connector.execute_query_tuples('SELECT 1'))
+    assert rows is None
+    assert result['columns'] == ['id', 'price', 'tags', 'name']
+    result, columns = asyncio.run(connector.execute_query_columns('SELECT 1'))
+    assert columns is None
+
+
+def test_execute_query_scalar():
+    connector = make_connector([[42]], [{'name': 'count()', 'type': 'UInt64'}])
+    result, value = asyncio.run(connector.execute_query_scalar('SELECT count()'))
+    assert value == 42
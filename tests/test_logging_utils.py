@@ -0,0 +1,203 @@
+import io
+import os
+import datetime
+import pytest
+from types import SimpleNamespace
+from libdixpy import logging_utils
+from libdixpy.logging_utils import LogRateLimiter, LogRotator, JsonFileSink
+
+
+class Message(str):
+    pass
+
+
+def make_message(text, time=None):
+    message = Message(text)
+    message.record = {'time': time or datetime.datetime.now()}
+    return message
+
+
+class CountingFile(io.StringIO):
+    seeks = 0
+
+    def seek(self, *args):
+        self.seeks += 1
+        return super().seek(*args)
+
+
+def test_rotator_counts_bytes():
+    rotator = LogRotator(size=100, at=datetime.time(0, 0, 0))
+    file = CountingFile()
+    message = make_message('я' * 30 + '\n')  # 31 символ, 61 байт
+    assert not rotator.should_rotate(message, file)
+    assert rotator.should_rotate(message, file)
+
+
+def test_rotator_seeks_once_per_file():
+    rotator = LogRotator(size=1e+7, at=datetime.time(0, 0, 0))
+    file = CountingFile()
+    for _ in range(10):
+        assert not rotator.should_rotate(make_message('message\n'), file)
+    assert file.seeks == 1
+    new_file = CountingFile()
+    rotator.should_rotate(make_message('message\n'), new_file)
+    assert new_file.seeks == 1
+
+
+def test_rotator_time_rollover():
+    now = datetime.datetime.now()
+    rotator = LogRotator(size=1e+7, at=(now + datetime.timedelta(hours=1)).time())
+    file = CountingFile()
+    later = now + datetime.timedelta(hours=1, seconds=1)
+    assert not rotator.should_rotate(make_message('message\n', now), file)
+    assert rotator.should_rotate(make_message('message\n', later), file)
+    # следующая ротация - через сутки
+    assert not rotator.should_rotate(make_message('message\n', later), file)
+
+
+def test_json_file_sink_rotation(tmp_path):
+    path = str(tmp_path / 'app.jsonl')
+    sink = JsonFileSink(path, rotator=LogRotator(size=100, at=datetime.time(0, 0, 0)), flush_interval=3600)
+    for _ in range(3):
+        sink.write(make_message('x' * 60 + '\n'))
+    sink.stop()
+    archives = [name for name in os.listdir(tmp_path) if name.endswith('.jsonl.gz')]
+    assert len(archives) == 2
+    with open(path, encoding='utf-8') as file:
+        assert file.read() == 'x' * 60 + '\n'
+
+
+def test_json_file_sink_stop_flushes(tmp_path):
+    path = str(tmp_path / 'app.jsonl')
+    sink = JsonFileSink(path, rotator=LogRotator(size=1e+7, at=datetime.time(0, 0, 0)), flush_interval=3600)
+    sink.write(make_message('{"message":"привет"}\n'))
+    assert os.path.getsize(path) == 0
+    sink.stop()
+    with open(path, encoding='utf-8') as file:
+        assert file.read() == '{"message":"привет"}\n'
+
+
+def test_json_file_sink_survives_failed_rotation(tmp_path, monkeypatch):
+    path = str(tmp_path / 'app.jsonl')
+    sink = JsonFileSink(path, rotator=LogRotator(size=100, at=datetime.time(0, 0, 0)), flush_interval=3600)
+    sink.write(make_message('a' * 60 + '\n'))
+
+    def fail(*args, **kwargs):
+        raise OSError('disk error')
+
+    monkeypatch.setattr(logging_utils.gzip, 'open', fail)
+    with pytest.raises(OSError):
+        sink.write(make_message('b' * 60 + '\n'))
+    monkeypatch.undo()
+    sink.write(make_message('c' * 10 + '\n'))
+    sink.stop()
+    with open(path, encoding='utf-8') as file:
+        assert file.read() == 'b' * 60 + '\n' + 'c' * 10 + '\n'
+
+
+def make_record(level='ERROR', line=1):
+    return {
+        'name': 'app', 'function': 'handler', 'line': line,
+        'level': SimpleNamespace(name=level), 'message': 'boom', 'extra': {},
+    }
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def make_limiter():
+    limiters = []
+
+    def factory(**kwargs):
+        clock = FakeClock()
+        limiter = LogRateLimiter(summary_interval=3600, clock=clock, **kwargs)
+        limiters.append(limiter)
+        return limiter, clock
+
+    yield factory
+    for limiter in limiters:
+        limiter.pop_suppressed()
+        limiter.stop()
+
+
+def test_rate_limiter_token_bucket(make_limiter):
+    limiter, clock = make_limiter(rate=2, burst=3)
+    assert [limiter.filter(make_record()) for _ in range(5)] == [True, True, True, False, False]
+    # за 0.5 секунды при rate=2 пополняется один токен
+    clock.now += 0.5
+    assert [limiter.filter(make_record()) for _ in range(2)] == [True, False]
+    # больше burst токенов не накапливается
+    clock.now += 100
+    assert [limiter.filter(make_record()) for _ in range(4)] == [True, True, True, False]
+
+
+def test_rate_limiter_suppressed_count(make_limiter):
+    limiter, clock = make_limiter(rate=1, burst=1)
+    for _ in range(10):
+        limiter.filter(make_record())
+    limiter.filter(make_record(line=2))
+    assert limiter.pop_suppressed() == [('app', 'handler', 1, 'ERROR', 9)]
+    assert limiter.pop_suppressed() == []
+
+
+def test_rate_limiter_same_record_decided_once(make_limiter):
+    limiter, clock = make_limiter(rate=1, burst=1)
+    record = make_record()
+    assert limiter.filter(record) and limiter.filter(record)
+    record = make_record()
+    assert not limiter.filter(record) and not limiter.filter(record)
+    assert limiter.pop_suppressed() == [('app', 'handler', 1, 'ERROR', 1)]
+
+
+def test_rate_limiter_per_level(make_limiter):
+    limiter, clock = make_limiter(rate={'ERROR': 1}, burst=1)
+    assert all(limiter.filter(make_record(level='INFO')) for _ in range(100))
+    assert [limiter.filter(make_record()) for _ in range(2)] == [True, False]
+
+
+def test_rate_limiter_ignores_summary_records(make_limiter):
+    limiter, clock = make_limiter(rate=1, burst=1)
+    summary = make_record()
+    summary['extra']['rate_limit_summary'] = True
+    # итоговая строка не тратит токен места вызова
+    assert limiter.filter(summary)
+    assert limiter.filter(make_record())
+    assert not limiter.filter(make_record())
+    assert limiter.filter(summary)
+    assert limiter.pop_suppressed() == [('app', 'handler', 1, 'ERROR', 1)]
+
+
+def test_rate_limiter_log_summaries(make_limiter, monkeypatch):
+    logged = []
+
+    class FakeLogger:
+        def bind(self, **kwargs):
+            self.extra = kwargs
+            return self
+
+        def patch(self, patcher):
+            self.patcher = patcher
+            return self
+
+        def log(self, level, message):
+            record = {'extra': dict(self.extra)}
+            self.patcher(record)
+            logged.append((level, message, record))
+
+    monkeypatch.setattr(logging_utils, 'logger', FakeLogger())
+    limiter, clock = make_limiter(rate=1, burst=1)
+    for _ in range(5):
+        limiter.filter(make_record())
+    limiter.log_summaries()
+    assert logged == [(
+        'ERROR', '4 similar messages suppressed',
+        {'extra': {'rate_limit_summary': True}, 'name': 'app', 'function': 'handler', 'line': 1},
+    )]
+    limiter.log_summaries()
+    assert len(logged) == 1